@@ -1,66 +1,320 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, g, has_request_context
 from flask_cors import CORS
+from concurrent.futures import ThreadPoolExecutor
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from collections import OrderedDict
 import requests
 import os
 import json
+import math
+import sqlite3
+import time
+import uuid
+import threading
+
+from http_common import FastJSONProvider, parse_trace_id, is_uuid
+from tracking_numbers import normalize_tracking_number
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
 # Service URLs
 PACKAGE_SERVICE_URL = os.getenv('PACKAGE_SERVICE_URL', 'http://localhost:5001')
 DELIVERY_SERVICE_URL = os.getenv('DELIVERY_SERVICE_URL', 'http://localhost:5002')
 USER_SERVICE_URL = os.getenv('USER_SERVICE_URL', 'http://localhost:5003')
+QUERY_SERVICE_URL = os.getenv('QUERY_SERVICE_URL', 'http://localhost:5004')
+
+SERVICES = {
+    'package-service': PACKAGE_SERVICE_URL,
+    'delivery-service': DELIVERY_SERVICE_URL,
+    'user-service': USER_SERVICE_URL,
+    'query-service': QUERY_SERVICE_URL
+}
+SERVICE_NAMES = {service_url: service_name for service_name, service_url in SERVICES.items()}
+
+# Health check configuration
+HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', '2'))
+HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', '5'))
+health_executor = ThreadPoolExecutor(max_workers=len(SERVICES))
+health_cache = {'checked_at': None, 'services': None}
+health_lock = threading.Lock()
+
+# Metrics
+METRICS_REGISTRY = CollectorRegistry()
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency', ['method', 'route', 'status'], registry=METRICS_REGISTRY)
+UPSTREAM_LATENCY = Histogram('upstream_request_duration_seconds', 'Latency of proxied service calls', ['service', 'method', 'status'], registry=METRICS_REGISTRY)
+REJECTED_REQUESTS = Counter('gateway_rejected_requests', 'Requests rejected by rate limiting or load shedding', ['reason', 'target'], registry=METRICS_REGISTRY)
+CONCURRENCY_LIMIT = Gauge('upstream_concurrency_limit', 'Adaptive concurrency limit per upstream', ['service'], registry=METRICS_REGISTRY)
+UPSTREAM_IN_FLIGHT = Gauge('upstream_in_flight_requests', 'Proxied requests in flight per upstream', ['service'], registry=METRICS_REGISTRY)
+
+# Tracing (W3C traceparent: version-trace_id-span_id-flags)
+def trace_headers():
+    """Headers continuing the current request's trace in a downstream call"""
+    trace_id = g.get('trace_id') if has_request_context() else None
+    return {'traceparent': f"00-{trace_id or uuid.uuid4().hex}-{os.urandom(8).hex()}-01"}
+
+@app.before_request
+def start_request():
+    g.request_started = time.perf_counter()
+    g.trace_id = parse_trace_id(request.headers.get('traceparent')) or uuid.uuid4().hex
+
+@app.after_request
+def finish_request(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUEST_LATENCY.labels(request.method, route, response.status_code).observe(time.perf_counter() - g.request_started)
+    response.headers.update(trace_headers())
+    return response
+
+# Rate limiting: token buckets per route class, one per client IP and one per known X-API-Key
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+# Comma-separated; unknown keys get no bucket of their own, so they cannot be rotated to dodge the IP limit
+API_KEYS = {key.strip() for key in os.getenv('API_KEYS', '').split(',') if key.strip()}
+# Per-IP limits are the route class limits times this, for clients sharing an address behind NAT
+RATE_LIMIT_IP_MULTIPLIER = float(os.getenv('RATE_LIMIT_IP_MULTIPLIER', '1'))
+RATE_LIMITS = {
+    # route class: (tokens per second, burst)
+    route_class: (float(os.getenv(f'RATE_LIMIT_{route_class.upper()}_RATE', rate)),
+                  float(os.getenv(f'RATE_LIMIT_{route_class.upper()}_BURST', burst)))
+    for route_class, rate, burst in (
+        ('tracking', '10', '20'),
+        ('auth', '1', '5'),
+        ('write', '10', '20'),
+        ('read', '50', '100')
+    )
+}
+ROUTE_CLASSES = {
+    'track_package': 'tracking',
+    'get_package_full_details': 'tracking',
+    'login': 'auth'
+}
+RATE_LIMIT_EXEMPT = {'health_check', 'metrics'}
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv('RATE_LIMIT_MAX_CLIENTS', '100000'))
+RATE_LIMIT_IDLE_SECONDS = float(os.getenv('RATE_LIMIT_IDLE_SECONDS', '3600'))
+# Set to a file on tmpfs (e.g. /dev/shm/gateway-rate-limits.db) to share buckets across worker processes
+RATE_LIMIT_STATE_PATH = os.getenv('RATE_LIMIT_STATE_PATH')
+
+class LocalBuckets:
+    """In-process token buckets, least recently used clients evicted first"""
+    
+    def __init__(self, max_clients):
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def take(self, key, rate, burst, now):
+        """Take a token; returns the tokens left, negative when the bucket was empty"""
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = [burst, now]
+                if len(self.buckets) > self.max_clients:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                return tokens - 1
+            bucket[0] = tokens - 1
+            return bucket[0]
+
+class SharedBuckets:
+    """Token buckets in a SQLite file shared by all gateway processes on the host"""
+    
+    TAKE = """
+        INSERT INTO buckets (key, tokens, updated_at, allowed) VALUES (:key, :burst - 1, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = min(:burst, tokens + (:now - updated_at) * :rate)
+                     - (min(:burst, tokens + (:now - updated_at) * :rate) >= 1),
+            updated_at = :now,
+            allowed = min(:burst, tokens + (:now - updated_at) * :rate) >= 1
+        RETURNING tokens, allowed
+    """
+    
+    def __init__(self, path, idle_seconds):
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self.local = threading.local()
+        self.connection().execute('CREATE TABLE IF NOT EXISTS buckets '
+                                  '(key TEXT PRIMARY KEY, tokens REAL, updated_at REAL, allowed INTEGER)')
+    
+    def connection(self):
+        if not hasattr(self.local, 'connection'):
+            # Autocommit: each take is a single atomic UPSERT
+            self.local.connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            self.local.connection.execute('PRAGMA journal_mode=WAL')
+            self.local.connection.execute('PRAGMA synchronous=OFF')
+            self.local.pruned_at = time.time()
+        return self.local.connection
+    
+    def take(self, key, rate, burst, now):
+        connection = self.connection()
+        tokens, allowed = connection.execute(self.TAKE, {'key': key, 'rate': rate, 'burst': burst, 'now': now}).fetchone()
+        if now - self.local.pruned_at >= self.idle_seconds:
+            # Buckets idle this long are full again, the same as no bucket
+            self.local.pruned_at = now
+            connection.execute('DELETE FROM buckets WHERE updated_at < ?', (now - self.idle_seconds,))
+        return tokens if allowed else tokens - 1
+
+rate_limit_buckets = (SharedBuckets(RATE_LIMIT_STATE_PATH, RATE_LIMIT_IDLE_SECONDS) if RATE_LIMIT_STATE_PATH
+                      else LocalBuckets(RATE_LIMIT_MAX_CLIENTS))
+
+def route_class():
+    endpoint = request.endpoint
+    if endpoint in ROUTE_CLASSES:
+        return ROUTE_CLASSES[endpoint]
+    return 'read' if request.method in ('GET', 'HEAD', 'OPTIONS') else 'write'
+
+@app.before_request
+def enforce_rate_limit():
+    if not RATE_LIMIT_ENABLED or request.endpoint is None or request.endpoint in RATE_LIMIT_EXEMPT:
+        return None
+    limit_class = route_class()
+    rate, burst = RATE_LIMITS[limit_class]
+    now = time.time()
+    api_key = request.headers.get('X-API-Key')
+    if api_key in API_KEYS:
+        tokens = rate_limit_buckets.take(f"{limit_class}:key:{api_key}", rate, burst, now)
+    else:
+        tokens = 0
+    if tokens >= 0:
+        # Every request also counts against its address, validated key or not
+        rate, burst = rate * RATE_LIMIT_IP_MULTIPLIER, burst * RATE_LIMIT_IP_MULTIPLIER
+        tokens = rate_limit_buckets.take(f"{limit_class}:ip:{request.remote_addr}", rate, burst, now)
+        if tokens >= 0:
+            return None
+    REJECTED_REQUESTS.labels('rate_limited', limit_class).inc()
+    retry_after = math.ceil(-tokens / rate)
+    return jsonify({'error': 'Rate limit exceeded'}), 429, {'Retry-After': str(retry_after)}
+
+# Load shedding: an AIMD concurrency limit per upstream
+UPSTREAM_CONCURRENCY_ENABLED = os.getenv('UPSTREAM_CONCURRENCY_ENABLED', 'true').lower() == 'true'
+UPSTREAM_LATENCY_TARGET = float(os.getenv('UPSTREAM_LATENCY_TARGET', '0.5'))
+UPSTREAM_TIMEOUT = float(os.getenv('UPSTREAM_TIMEOUT', '10'))
+
+class ConcurrencyLimiter:
+    """Adaptive in-flight limit for one upstream.
+    
+    Grows by one for every limit's worth of fast responses while the limit
+    is in use, and halves (at most once per latency target) when a response
+    is slower than the target or the upstream fails.
+    """
+    
+    def __init__(self, service_name, initial, minimum, maximum, latency_target):
+        self.service_name = service_name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+        CONCURRENCY_LIMIT.labels(service_name).set(self.limit)
+    
+    def try_acquire(self):
+        with self.lock:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+        UPSTREAM_IN_FLIGHT.labels(self.service_name).inc()
+        return True
+    
+    def release(self, latency, failed):
+        with self.lock:
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            now = time.monotonic()
+            if failed or latency > self.latency_target:
+                if now - self.last_decrease >= self.latency_target:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self.last_decrease = now
+            elif in_flight * 2 >= self.limit:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            limit = self.limit
+        UPSTREAM_IN_FLIGHT.labels(self.service_name).dec()
+        CONCURRENCY_LIMIT.labels(self.service_name).set(limit)
+
+upstream_limiters = {
+    service_name: ConcurrencyLimiter(
+        service_name,
+        initial=int(os.getenv('UPSTREAM_CONCURRENCY_INITIAL', '20')),
+        minimum=int(os.getenv('UPSTREAM_CONCURRENCY_MIN', '2')),
+        maximum=int(os.getenv('UPSTREAM_CONCURRENCY_MAX', '200')),
+        latency_target=UPSTREAM_LATENCY_TARGET
+    )
+    for service_name in SERVICES
+}
+
+class UpstreamOverloaded(Exception):
+    """The upstream's concurrency limit is full and the call was shed"""
+
+def call_upstream(service_url, path, method='GET', data=None, params=None, timeout=UPSTREAM_TIMEOUT):
+    """One call to a service under its concurrency limit, with latency recorded"""
+    service_name = SERVICE_NAMES.get(service_url, service_url)
+    limiter = upstream_limiters.get(service_name) if UPSTREAM_CONCURRENCY_ENABLED else None
+    if limiter and not limiter.try_acquire():
+        REJECTED_REQUESTS.labels('overloaded', service_name).inc()
+        raise UpstreamOverloaded(service_name)
+    
+    started = time.perf_counter()
+    failed = True
+    try:
+        response = requests.request(method, f"{service_url}{path}", params=params, json=data,
+                                    headers=trace_headers(), timeout=timeout)
+        failed = response.status_code >= 500
+        UPSTREAM_LATENCY.labels(service_name, method, response.status_code).observe(
+            time.perf_counter() - started)
+        return response
+    finally:
+        if limiter:
+            limiter.release(time.perf_counter() - started, failed)
 
 def proxy_request(service_url, path, method='GET', data=None, params=None):
     """Proxy requests to microservices"""
+    if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+        return jsonify({'error': 'Unsupported method'}), 400
+    
     try:
-        url = f"{service_url}{path}"
-        
-        if method == 'GET':
-            response = requests.get(url, params=params)
-        elif method == 'POST':
-            response = requests.post(url, json=data)
-        elif method == 'PUT':
-            response = requests.put(url, json=data)
-        elif method == 'DELETE':
-            response = requests.delete(url)
-        else:
-            return jsonify({'error': 'Unsupported method'}), 400
-        
+        response = call_upstream(service_url, path, method, data=data, params=params)
         return Response(
             response.content,
             status=response.status_code,
             headers=dict(response.headers)
         )
         
+    except UpstreamOverloaded as e:
+        # Shed load before it queues up in an upstream that is already slow
+        return jsonify({'error': f'Service overloaded: {e}'}), 503, {'Retry-After': '1'}
     except requests.exceptions.RequestException as e:
         return jsonify({'error': f'Service unavailable: {str(e)}'}), 503
 
+def check_service(service_url):
+    try:
+        response = requests.get(f"{service_url}/health", timeout=HEALTH_CHECK_TIMEOUT)
+        return {
+            'status': 'healthy' if response.status_code == 200 else 'unhealthy',
+            'response_time': response.elapsed.total_seconds()
+        }
+    except Exception as e:
+        return {
+            'status': 'unhealthy',
+            'error': str(e)
+        }
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Gateway health check"""
-    services_health = {}
-    
-    # Check each service
-    services = {
-        'package-service': PACKAGE_SERVICE_URL,
-        'delivery-service': DELIVERY_SERVICE_URL,
-        'user-service': USER_SERVICE_URL
-    }
-    
-    for service_name, service_url in services.items():
-        try:
-            response = requests.get(f"{service_url}/health", timeout=5)
-            services_health[service_name] = {
-                'status': 'healthy' if response.status_code == 200 else 'unhealthy',
-                'response_time': response.elapsed.total_seconds()
-            }
-        except Exception as e:
-            services_health[service_name] = {
-                'status': 'unhealthy',
-                'error': str(e)
-            }
+    # Check all services concurrently, at most once per HEALTH_CACHE_TTL;
+    # callers arriving during a refresh wait for it instead of piling on
+    with health_lock:
+        checked_at = health_cache['checked_at']
+        if checked_at is None or time.monotonic() - checked_at >= HEALTH_CACHE_TTL:
+            results = health_executor.map(check_service, SERVICES.values())
+            health_cache['services'] = dict(zip(SERVICES, results))
+            health_cache['checked_at'] = time.monotonic()
+        services_health = health_cache['services']
     
     overall_status = 'healthy' if all(
         service['status'] == 'healthy' for service in services_health.values()
@@ -72,6 +326,10 @@ def health_check():
         'gateway': 'api-gateway'
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(generate_latest(METRICS_REGISTRY), headers={'Content-Type': CONTENT_TYPE_LATEST})
+
 # Package Service Routes
 @app.route('/api/packages', methods=['GET', 'POST'])
 def packages():
@@ -86,6 +344,8 @@ def get_package(package_id):
 
 @app.route('/api/packages/tracking/<tracking_number>', methods=['GET'])
 def track_package(tracking_number):
+    if normalize_tracking_number(tracking_number) is None:
+        return jsonify({'error': 'Invalid tracking number'}), 400
     return proxy_request(PACKAGE_SERVICE_URL, f'/packages/tracking/{tracking_number}', 'GET')
 
 @app.route('/api/packages/<package_id>/status', methods=['PUT'])
@@ -146,23 +406,42 @@ def drivers():
 # Aggregated endpoints
 @app.route('/api/packages/<package_id>/full-details', methods=['GET'])
 def get_package_full_details(package_id):
-    """Get package details with delivery and user information"""
+    """Get package details with delivery and user information.
+
+    Both paths return the same body. Responses served from the tracking view
+    also carry an X-Projected-At header; live aggregation does not.
+    """
     try:
+        if not is_uuid(package_id):
+            return jsonify({'error': 'Package not found'}), 404
+        
+        # Serve from the denormalized tracking view when it has the package
+        try:
+            view_response = call_upstream(QUERY_SERVICE_URL, f'/package-views/{package_id}', timeout=2)
+            if view_response.status_code == 200:
+                response = Response(view_response.content, status=200, mimetype='application/json')
+                if 'X-Projected-At' in view_response.headers:
+                    response.headers['X-Projected-At'] = view_response.headers['X-Projected-At']
+                return response
+        except (UpstreamOverloaded, requests.exceptions.RequestException):
+            pass
+        
+        # Projection has not caught up (or is unavailable): aggregate live,
+        # each call under its service's concurrency limit
         # Get package details
-        package_response = requests.get(f"{PACKAGE_SERVICE_URL}/packages/{package_id}")
+        package_response = call_upstream(PACKAGE_SERVICE_URL, f'/packages/{package_id}')
         if package_response.status_code != 200:
             return jsonify({'error': 'Package not found'}), 404
         
         package_data = package_response.json()
         
         # Get delivery details
-        delivery_response = requests.get(f"{DELIVERY_SERVICE_URL}/deliveries", 
-                                       params={'package_id': package_id})
+        delivery_response = call_upstream(DELIVERY_SERVICE_URL, '/deliveries', params={'package_id': package_id})
         delivery_data = delivery_response.json() if delivery_response.status_code == 200 else []
         
         # Get sender and recipient details
-        sender_response = requests.get(f"{USER_SERVICE_URL}/users/{package_data['sender_id']}")
-        recipient_response = requests.get(f"{USER_SERVICE_URL}/users/{package_data['recipient_id']}")
+        sender_response = call_upstream(USER_SERVICE_URL, f"/users/{package_data['sender_id']}")
+        recipient_response = call_upstream(USER_SERVICE_URL, f"/users/{package_data['recipient_id']}")
         
         result = {
             'package': package_data,
@@ -173,6 +452,10 @@ def get_package_full_details(package_id):
         
         return jsonify(result)
         
+    except UpstreamOverloaded as e:
+        return jsonify({'error': f'Service overloaded: {e}'}), 503, {'Retry-After': '1'}
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': f'Service unavailable: {str(e)}'}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
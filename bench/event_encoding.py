@@ -0,0 +1,97 @@
+"""Size and speed of the parcel_events message encodings.
+
+Encodes and decodes representative package and delivery events with the
+codec from package-service (which is also used by delivery-service) and
+reports bytes/event and encode/decode ns/event for each encoding.
+
+    python bench/event_encoding.py --events 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from services import load_service
+
+# Encoding and compression threshold (0 disables compression, 1 compresses every event)
+ENCODINGS = {
+    'json': ('json', 0),
+    'json+zstd': ('json', 1),
+    'msgpack': ('msgpack', 0),
+    'msgpack+zstd': ('msgpack', 1)
+}
+
+
+def sample_events(count):
+    now = datetime.utcnow()
+    events = []
+    for index in range(count):
+        created = now - timedelta(seconds=index)
+        if index % 2 == 0:
+            data = {
+                'id': str(uuid.uuid4()),
+                'tracking_number': f"PKG{created.strftime('%Y%m%d')}{uuid.uuid4().hex[:8].upper()}",
+                'sender_id': str(uuid.uuid4()),
+                'recipient_id': str(uuid.uuid4()),
+                'sender_address': f"{index} Main St, New York, NY 10001",
+                'recipient_address': f"{index} Oak Ave, Los Angeles, CA 90210",
+                'weight': 2.5,
+                'dimensions': '12x8x6',
+                'status': 'created',
+                'created_at': created.isoformat(),
+                'updated_at': created.isoformat()
+            }
+            event_type = 'created'
+        else:
+            data = {
+                'delivery_id': str(uuid.uuid4()),
+                'package_id': str(uuid.uuid4()),
+                'old_status': 'picked_up',
+                'new_status': 'in_transit'
+            }
+            event_type = 'status_updated'
+        events.append({'event_type': event_type, 'timestamp': created.isoformat(), 'data': data})
+    return events
+
+
+def measure(service, events, encoding, threshold):
+    service.service_common.EVENT_ENCODING = encoding
+    service.service_common.EVENT_COMPRESSION_THRESHOLD = threshold
+
+    started = time.perf_counter_ns()
+    encoded = [service.encode_event(message) for message in events]
+    encode_ns = time.perf_counter_ns() - started
+
+    started = time.perf_counter_ns()
+    decoded = [service.decode_event(body, properties) for body, properties in encoded]
+    decode_ns = time.perf_counter_ns() - started
+
+    if decoded != events:
+        raise AssertionError(f"{encoding} did not round-trip")
+
+    return {
+        'bytes_per_event': sum(len(body) for body, properties in encoded) / len(events),
+        'encode_ns_per_event': encode_ns / len(events),
+        'decode_ns_per_event': decode_ns / len(events)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=100000)
+    args = parser.parse_args()
+
+    service = load_service('package-service')
+    events = sample_events(args.events)
+    results = {
+        name: measure(service, events, encoding, threshold)
+        for name, (encoding, threshold) in ENCODINGS.items()
+    }
+    json.dump({'timestamp': datetime.utcnow().isoformat(), 'events': args.events, 'encodings': results},
+              sys.stdout, indent=2)
+    print()
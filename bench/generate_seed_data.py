@@ -0,0 +1,178 @@
+"""Generate a large-volume version of scripts/seed-data.sql.
+
+Emits SQL that fills every service database with consistent rows. Packages
+reference existing customers, each package has one delivery whose status
+matches it, and the query-service tracking view and user directory hold
+the same data denormalized. Rows are produced server-side with
+generate_series, so millions of rows load without a large SQL file. Ids are
+md5-derived UUIDs, so re-running with the same sizes is idempotent.
+
+    python bench/generate_seed_data.py --packages 5000000 > /tmp/seed-large.sql
+    psql -h localhost -U postgres -f /tmp/seed-large.sql
+
+The databases run on separate servers in docker-compose. Use --database to
+emit only the section for one of them:
+
+    python bench/generate_seed_data.py --packages 5000000 --database package_service \\
+        | psql -h localhost -p 5432 -U postgres -d package_service
+"""
+import argparse
+import sys
+
+# Legacy-format tracking numbers (PKG + date + 8 hex digits), unique per g and the same on every run
+TRACKING_NUMBER = "'PKG20240101' || upper(lpad(to_hex(g), 8, '0'))"
+PASSWORD_HASH = '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm'
+
+# Package status by g % 10, and the matching delivery status
+STATUS_BY_BUCKET = ("CASE WHEN g % 10 < 3 THEN 'created' WHEN g % 10 < 5 THEN 'picked_up' "
+                    "WHEN g % 10 < 7 THEN 'in_transit' ELSE 'delivered' END")
+DELIVERY_STATUS_BY_BUCKET = ("CASE WHEN g % 10 < 2 THEN 'pending' WHEN g % 10 < 3 THEN 'assigned' "
+                             "WHEN g % 10 < 5 THEN 'picked_up' WHEN g % 10 < 7 THEN 'in_transit' "
+                             "ELSE 'delivered' END")
+
+
+def uuid_sql(prefix, expression):
+    return f"md5('{prefix}-' || ({expression}))::uuid"
+
+
+def sender(customers):
+    return f"(g % {customers}) + 1"
+
+
+def recipient(customers):
+    return f"((g * 7 + 3) % {customers}) + 1"
+
+
+def created_at():
+    # Spread over the last 30 days so time-range queries see realistic data
+    return "now() - ((g % 2592000) * interval '1 second')"
+
+
+def user_service_sql(customers, drivers):
+    return f"""-- Seed User Service with {customers} customers and {drivers} drivers
+\\c user_service;
+
+INSERT INTO users (id, email, password_hash, first_name, last_name, phone, user_type)
+SELECT {uuid_sql('customer', 'g')}, 'customer' || g || '@bench.example.com', '{PASSWORD_HASH}',
+       'Customer', 'No' || g, '+1' || lpad(g::text, 10, '0'), 'customer'
+FROM generate_series(1, {customers}) AS g
+ON CONFLICT DO NOTHING;
+
+INSERT INTO users (id, email, password_hash, first_name, last_name, phone, user_type)
+SELECT {uuid_sql('driver', 'g')}, 'driver' || g || '@bench.example.com', '{PASSWORD_HASH}',
+       'Driver', 'No' || g, '+2' || lpad(g::text, 10, '0'), 'driver'
+FROM generate_series(1, {drivers}) AS g
+ON CONFLICT DO NOTHING;
+
+INSERT INTO addresses (id, user_id, address_type, street_address, city, state, postal_code, is_default)
+SELECT {uuid_sql('address', 'g')}, {uuid_sql('customer', 'g')}, 'home', g || ' Main St', 'New York', 'NY',
+       lpad((g % 100000)::text, 5, '0'), true
+FROM generate_series(1, {customers}) AS g
+ON CONFLICT DO NOTHING;
+"""
+
+
+def package_service_sql(packages, customers):
+    return f"""-- Seed Package Service with {packages} packages
+\\c package_service;
+
+INSERT INTO packages (id, tracking_number, sender_id, recipient_id, sender_address, recipient_address,
+                      weight, dimensions, status, created_at, updated_at)
+SELECT {uuid_sql('package', 'g')}, {TRACKING_NUMBER},
+       {uuid_sql('customer', sender(customers))}, {uuid_sql('customer', recipient(customers))},
+       ({sender(customers)}) || ' Main St, New York, NY 10001',
+       ({recipient(customers)}) || ' Main St, New York, NY 10001',
+       round((0.1 + (g % 300) / 10.0)::numeric, 2), '12x8x6', {STATUS_BY_BUCKET},
+       {created_at()}, {created_at()}
+FROM generate_series(1, {packages}) AS g
+ON CONFLICT DO NOTHING;
+
+ANALYZE packages;
+"""
+
+
+def delivery_service_sql(packages, customers, drivers):
+    return f"""-- Seed Delivery Service with one delivery per package
+\\c delivery_service;
+
+INSERT INTO deliveries (id, package_id, driver_id, pickup_address, delivery_address, status,
+                        estimated_delivery, actual_delivery, created_at, updated_at)
+SELECT {uuid_sql('delivery', 'g')}, {uuid_sql('package', 'g')},
+       CASE WHEN g % 10 < 2 THEN NULL ELSE {uuid_sql('driver', f'(g % {drivers}) + 1')} END,
+       ({sender(customers)}) || ' Main St, New York, NY 10001',
+       ({recipient(customers)}) || ' Main St, New York, NY 10001',
+       {DELIVERY_STATUS_BY_BUCKET},
+       {created_at()} + interval '3 days',
+       CASE WHEN g % 10 >= 7 THEN {created_at()} + interval '2 days' END,
+       {created_at()}, {created_at()}
+FROM generate_series(1, {packages}) AS g
+ON CONFLICT DO NOTHING;
+
+ANALYZE deliveries;
+"""
+
+
+def query_service_sql(packages, customers, drivers):
+    return f"""-- Seed Query Service with the matching tracking view
+\\c query_service;
+
+INSERT INTO user_directory (id, email, first_name, last_name, phone, user_type, is_active, created_at, updated_at)
+SELECT {uuid_sql('customer', 'g')}, 'customer' || g || '@bench.example.com', 'Customer', 'No' || g,
+       '+1' || lpad(g::text, 10, '0'), 'customer', true, now(), now()
+FROM generate_series(1, {customers}) AS g
+UNION ALL
+SELECT {uuid_sql('driver', 'g')}, 'driver' || g || '@bench.example.com', 'Driver', 'No' || g,
+       '+2' || lpad(g::text, 10, '0'), 'driver', true, now(), now()
+FROM generate_series(1, {drivers}) AS g
+ON CONFLICT DO NOTHING;
+
+INSERT INTO package_tracking_view (package_id, tracking_number, sender_id, recipient_id, sender_address,
+                                   recipient_address, weight, dimensions, package_status, package_created_at,
+                                   package_updated_at, delivery_id, driver_id, pickup_address, delivery_address,
+                                   delivery_status, estimated_delivery, actual_delivery, delivery_created_at,
+                                   delivery_updated_at, projected_at)
+SELECT {uuid_sql('package', 'g')}, {TRACKING_NUMBER},
+       {uuid_sql('customer', sender(customers))}, {uuid_sql('customer', recipient(customers))},
+       ({sender(customers)}) || ' Main St, New York, NY 10001',
+       ({recipient(customers)}) || ' Main St, New York, NY 10001',
+       round((0.1 + (g % 300) / 10.0)::numeric, 2), '12x8x6', {STATUS_BY_BUCKET},
+       {created_at()}, {created_at()},
+       {uuid_sql('delivery', 'g')},
+       CASE WHEN g % 10 < 2 THEN NULL ELSE {uuid_sql('driver', f'(g % {drivers}) + 1')} END,
+       ({sender(customers)}) || ' Main St, New York, NY 10001',
+       ({recipient(customers)}) || ' Main St, New York, NY 10001',
+       {DELIVERY_STATUS_BY_BUCKET},
+       {created_at()} + interval '3 days',
+       CASE WHEN g % 10 >= 7 THEN {created_at()} + interval '2 days' END,
+       {created_at()}, {created_at()},
+       now()
+FROM generate_series(1, {packages}) AS g
+ON CONFLICT DO NOTHING;
+
+ANALYZE package_tracking_view;
+"""
+
+
+def generate(packages, customers, drivers, database=None):
+    sections = {
+        'user_service': user_service_sql(customers, drivers),
+        'package_service': package_service_sql(packages, customers),
+        'delivery_service': delivery_service_sql(packages, customers, drivers),
+        'query_service': query_service_sql(packages, customers, drivers)
+    }
+    if database:
+        # Piped into a single database: drop the \c line
+        return sections[database].replace(f"\\c {database};\n", '')
+    return '\n'.join(sections.values())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--packages', type=int, default=1000000)
+    parser.add_argument('--customers', type=int, default=100000)
+    parser.add_argument('--drivers', type=int, default=2000)
+    parser.add_argument('--database', choices=['user_service', 'package_service', 'delivery_service', 'query_service'],
+                        help='emit only the section for this database')
+    args = parser.parse_args()
+
+    sys.stdout.write(generate(args.packages, args.customers, args.drivers, args.database))
@@ -0,0 +1,98 @@
+"""Micro-benchmark for serializing Package rows in list endpoints.
+
+Compares the previous path (ORM objects -> to_dict() -> stdlib JSON) with
+the current one (raw column rows -> FastJSONProvider). Loading is measured
+against a SQLite file so that ORM hydration is part of the comparison.
+
+    python bench/json_serialization.py --rows 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(), 'json_serialization.db')
+os.environ['DATABASE_URL'] = f"sqlite:///{DATABASE_FILE}"
+
+from flask.json.provider import DefaultJSONProvider
+
+from services import load_service
+
+import http_common
+
+
+def seed(service, rows):
+    with service.app.app_context():
+        service.db.create_all()
+        now = datetime.utcnow()
+        service.db.session.execute(service.db.insert(service.Package), [{
+            'id': str(uuid.uuid4()),
+            'tracking_number': f"PKG{index:017d}",
+            'sender_id': str(uuid.uuid4()),
+            'recipient_id': str(uuid.uuid4()),
+            'sender_address': f"{index} Main St, New York, NY 10001",
+            'recipient_address': f"{index} Oak Ave, Los Angeles, CA 90210",
+            'weight': 2.5,
+            'dimensions': '12x8x6',
+            'status': 'created',
+            'created_at': now,
+            'updated_at': now
+        } for index in range(rows)])
+        service.db.session.commit()
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def run(rows):
+    service = load_service('package-service')
+    seed(service, rows)
+    db, Package = service.db, service.Package
+    stdlib = DefaultJSONProvider(service.app)
+    fast = service.FastJSONProvider(service.app)
+
+    with service.app.app_context():
+        orm_rows, orm_load = timed(lambda: Package.query.all())
+        orm_dicts, to_dict = timed(lambda: [package.to_dict() for package in orm_rows])
+        orm_body, stdlib_dump = timed(lambda: stdlib.dumps(orm_dicts, separators=(',', ':')))
+        db.session.remove()
+
+        raw_rows, raw_load = timed(lambda: [dict(row) for row in db.session.execute(
+            db.select(*Package.__table__.columns)).mappings()])
+        raw_body, fast_dump = timed(lambda: fast.dumpb(raw_rows) if http_common.orjson else fast.dumps(raw_rows))
+
+    if json.loads(orm_body) != json.loads(raw_body):
+        raise AssertionError('raw rows serialize differently from to_dict()')
+
+    return {
+        'timestamp': datetime.utcnow().isoformat(),
+        'rows': rows,
+        'orjson': http_common.orjson is not None,
+        'orm_to_dict_stdlib': {
+            'load_seconds': orm_load,
+            'to_dict_seconds': to_dict,
+            'dump_seconds': stdlib_dump,
+            'total_seconds': orm_load + to_dict + stdlib_dump
+        },
+        'raw_rows_fast_provider': {
+            'load_seconds': raw_load,
+            'dump_seconds': fast_dump,
+            'total_seconds': raw_load + fast_dump
+        }
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    json.dump(run(args.rows), sys.stdout, indent=2)
+    print()
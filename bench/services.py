@@ -0,0 +1,61 @@
+"""Helpers shared by the benchmarks for loading the services in-process."""
+import importlib.util
+import os
+import sys
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHARED = os.path.join(ROOT, 'shared')
+# The images copy shared/ next to app.py; here it goes on the path instead
+sys.path.insert(0, SHARED)
+
+
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_service(name, publish_events=False):
+    """Import <name>/app.py as a module without starting its server.
+
+    Each service gets a fresh copy of shared/service_common.py, so pool stats,
+    metrics and event-encoding settings stay per service as in production.
+    Tweak those through module.service_common. The api-gateway only uses
+    http_common.py, which holds no state and is imported once.
+    """
+    directory = os.path.join(ROOT, name)
+    common = None
+    if name != 'api-gateway':
+        common = load_module('service_common', os.path.join(SHARED, 'service_common.py'))
+        sys.modules['service_common'] = common
+    try:
+        module = load_module(name.replace('-', '_'), os.path.join(directory, 'app.py'))
+    finally:
+        sys.modules.pop('service_common', None)
+    module.service_common = common
+    if not publish_events:
+        module.publish_event = lambda *args, **kwargs: None
+    return module
+
+
+def create_entities(service, name, count):
+    with service.app.app_context():
+        service.db.create_all()
+        ids = [str(uuid.uuid4()) for _ in range(count)]
+        if name == 'package-service':
+            rows = [service.Package(id=entity_id, tracking_number=f"BENCH{entity_id[:12].upper()}",
+                                    sender_id=str(uuid.uuid4()), recipient_id=str(uuid.uuid4()),
+                                    sender_address='1 Bench St', recipient_address='2 Bench St',
+                                    weight=1.0, dimensions='1x1x1', status='created')
+                    for entity_id in ids]
+        else:
+            # Already assigned: only /assign may set that status
+            rows = [service.Delivery(id=entity_id, package_id=str(uuid.uuid4()), driver_id=str(uuid.uuid4()),
+                                     pickup_address='1 Bench St', delivery_address='2 Bench St',
+                                     status='assigned')
+                    for entity_id in ids]
+        service.db.session.add_all(rows)
+        service.db.session.commit()
+        return ids
@@ -0,0 +1,135 @@
+"""In-process stand-in for the RabbitMQ broker used by the benchmarks.
+
+Implements the subset of pika's BlockingConnection / BlockingChannel API the
+services use (topic exchanges, durable queues, prefetch, consume generators,
+basic_consume callbacks, single and multiple acks and nacks, with requeue). Install it into a loaded
+service module with ``broker.install(module)``.
+"""
+import itertools
+import re
+import threading
+import time
+from queue import Empty, Queue
+from types import SimpleNamespace
+
+
+def topic_pattern(binding_key):
+    """Compile an AMQP topic binding key ('*' = one word, '#' = zero or more)"""
+    words = []
+    for word in binding_key.split('.'):
+        if word == '#':
+            words.append(r'[^.]*(?:\.[^.]*)*')
+        elif word == '*':
+            words.append(r'[^.]+')
+        else:
+            words.append(re.escape(word))
+    return re.compile(r'\.'.join(words) + r'$')
+
+
+class StandInBroker:
+    def __init__(self):
+        self.queues = {}
+        self.bindings = []
+        self.lock = threading.Lock()
+        self.published = 0
+
+    def install(self, module):
+        module.get_rabbitmq_connection = lambda: StandInConnection(self)
+
+    def queue(self, name):
+        with self.lock:
+            return self.queues.setdefault(name, Queue())
+
+    def bind(self, exchange, queue_name, routing_key):
+        with self.lock:
+            self.bindings.append((exchange, topic_pattern(routing_key), queue_name))
+
+    def publish(self, exchange, routing_key, body, properties):
+        with self.lock:
+            targets = {queue_name for bound_exchange, pattern, queue_name in self.bindings
+                       if bound_exchange == exchange and pattern.match(routing_key)}
+            self.published += 1
+        for queue_name in targets:
+            self.queue(queue_name).put((routing_key, properties, body))
+
+    def depth(self):
+        return {name: pending.qsize() for name, pending in self.queues.items()}
+
+
+class StandInConnection:
+    def __init__(self, broker):
+        self.broker = broker
+
+    def channel(self):
+        return StandInChannel(self.broker)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def close(self):
+        pass
+
+
+class StandInChannel:
+    def __init__(self, broker):
+        self.broker = broker
+        self.prefetch_count = 0
+        self.delivery_tags = itertools.count(1)
+        self.unacked = {}  # delivery tag -> (queue, message), for requeueing nacks
+        self.consumers = []
+
+    def exchange_declare(self, exchange, exchange_type='direct', **kwargs):
+        pass
+
+    def queue_declare(self, queue, passive=False, **kwargs):
+        pending = self.broker.queue(queue)
+        return SimpleNamespace(method=SimpleNamespace(queue=queue, message_count=pending.qsize()))
+
+    def queue_bind(self, exchange, queue, routing_key=None, **kwargs):
+        self.broker.bind(exchange, queue, routing_key or queue)
+
+    def basic_qos(self, prefetch_count=0, **kwargs):
+        self.prefetch_count = prefetch_count
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, **kwargs):
+        self.broker.publish(exchange, routing_key, body, properties or SimpleNamespace(
+            content_type=None, content_encoding=None, headers=None))
+
+    def basic_ack(self, delivery_tag=0, multiple=False):
+        tags = [tag for tag in self.unacked if tag <= delivery_tag] if multiple else [delivery_tag]
+        return [self.unacked.pop(tag) for tag in sorted(tags) if tag in self.unacked]
+
+    def basic_nack(self, delivery_tag=0, multiple=False, requeue=True):
+        for pending, message in self.basic_ack(delivery_tag, multiple):
+            if requeue:
+                pending.put(message)
+
+    def _deliver(self, pending, timeout):
+        # Honour prefetch: no new deliveries while the window is full
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.prefetch_count and len(self.unacked) >= self.prefetch_count:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise Empty
+            time.sleep(0.001)
+        routing_key, properties, body = pending.get(timeout=timeout)
+        tag = next(self.delivery_tags)
+        self.unacked[tag] = (pending, (routing_key, properties, body))
+        return SimpleNamespace(routing_key=routing_key, delivery_tag=tag), properties, body
+
+    def consume(self, queue, inactivity_timeout=None, **kwargs):
+        pending = self.broker.queue(queue)
+        while True:
+            try:
+                yield self._deliver(pending, inactivity_timeout)
+            except Empty:
+                yield None, None, None
+
+    def basic_consume(self, queue, on_message_callback, **kwargs):
+        self.consumers.append((queue, on_message_callback))
+
+    def start_consuming(self):
+        queue_name, callback = self.consumers[0]
+        pending = self.broker.queue(queue_name)
+        while True:
+            method, properties, body = self._deliver(pending, None)
+            callback(self, method, properties, body)
@@ -2,10 +2,10 @@
 \c package_service;
 
 CREATE TABLE IF NOT EXISTS packages (
-    id VARCHAR(36) PRIMARY KEY,
+    id UUID PRIMARY KEY,
     tracking_number VARCHAR(20) UNIQUE NOT NULL,
-    sender_id VARCHAR(36) NOT NULL,
-    recipient_id VARCHAR(36) NOT NULL,
+    sender_id UUID NOT NULL,
+    recipient_id UUID NOT NULL,
     sender_address TEXT NOT NULL,
     recipient_address TEXT NOT NULL,
     weight DECIMAL(10,2) NOT NULL,
@@ -15,7 +15,6 @@ CREATE TABLE IF NOT EXISTS packages (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_packages_tracking ON packages(tracking_number);
 CREATE INDEX idx_packages_sender ON packages(sender_id);
 CREATE INDEX idx_packages_recipient ON packages(recipient_id);
 CREATE INDEX idx_packages_status ON packages(status);
@@ -24,9 +23,9 @@ CREATE INDEX idx_packages_status ON packages(status);
 \c delivery_service;
 
 CREATE TABLE IF NOT EXISTS deliveries (
-    id VARCHAR(36) PRIMARY KEY,
-    package_id VARCHAR(36) NOT NULL,
-    driver_id VARCHAR(36),
+    id UUID PRIMARY KEY,
+    package_id UUID NOT NULL,
+    driver_id UUID,
     pickup_address TEXT NOT NULL,
     delivery_address TEXT NOT NULL,
     status VARCHAR(20) DEFAULT 'pending',
@@ -37,8 +36,8 @@ CREATE TABLE IF NOT EXISTS deliveries (
 );
 
 CREATE TABLE IF NOT EXISTS delivery_routes (
-    id VARCHAR(36) PRIMARY KEY,
-    driver_id VARCHAR(36) NOT NULL,
+    id UUID PRIMARY KEY,
+    driver_id UUID NOT NULL,
     route_name VARCHAR(100) NOT NULL,
     deliveries JSONB NOT NULL,
     status VARCHAR(20) DEFAULT 'active',
@@ -54,7 +53,7 @@ CREATE INDEX idx_routes_driver ON delivery_routes(driver_id);
 \c user_service;
 
 CREATE TABLE IF NOT EXISTS users (
-    id VARCHAR(36) PRIMARY KEY,
+    id UUID PRIMARY KEY,
     email VARCHAR(120) UNIQUE NOT NULL,
     password_hash VARCHAR(128) NOT NULL,
     first_name VARCHAR(50) NOT NULL,
@@ -67,8 +66,8 @@ CREATE TABLE IF NOT EXISTS users (
 );
 
 CREATE TABLE IF NOT EXISTS addresses (
-    id VARCHAR(36) PRIMARY KEY,
-    user_id VARCHAR(36) REFERENCES users(id),
+    id UUID PRIMARY KEY,
+    user_id UUID REFERENCES users(id),
     address_type VARCHAR(20) DEFAULT 'home',
     street_address TEXT NOT NULL,
     city VARCHAR(100) NOT NULL,
@@ -79,6 +78,55 @@ CREATE TABLE IF NOT EXISTS addresses (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_type ON users(user_type);
 CREATE INDEX idx_addresses_user ON addresses(user_id);
+
+-- Initialize Query Service Database
+\c query_service;
+
+CREATE TABLE IF NOT EXISTS package_tracking_view (
+    package_id UUID PRIMARY KEY,
+    tracking_number VARCHAR(20),
+    sender_id UUID,
+    recipient_id UUID,
+    sender_address TEXT,
+    recipient_address TEXT,
+    weight DOUBLE PRECISION,
+    dimensions VARCHAR(50),
+    package_status VARCHAR(20),
+    package_created_at TIMESTAMP,
+    package_updated_at TIMESTAMP,
+    delivery_id UUID,
+    driver_id UUID,
+    pickup_address TEXT,
+    delivery_address TEXT,
+    delivery_status VARCHAR(20),
+    estimated_delivery TIMESTAMP,
+    actual_delivery TIMESTAMP,
+    delivery_created_at TIMESTAMP,
+    delivery_updated_at TIMESTAMP,
+    projected_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_directory (
+    id UUID PRIMARY KEY,
+    email VARCHAR(120),
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    phone VARCHAR(20),
+    user_type VARCHAR(20),
+    is_active BOOLEAN,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS projection_events (
+    seq BIGSERIAL PRIMARY KEY,
+    routing_key VARCHAR(50) NOT NULL,
+    message JSON NOT NULL,
+    received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_tracking_view_sender ON package_tracking_view(sender_id);
+CREATE INDEX idx_tracking_view_recipient ON package_tracking_view(recipient_id);
+CREATE INDEX idx_tracking_view_driver ON package_tracking_view(driver_id);
@@ -0,0 +1,96 @@
+-- Migrate VARCHAR(36) ids to native UUID and drop indexes that duplicate UNIQUE constraints.
+--
+-- UUID ids keep their value. Anything else (e.g. the old 'customer-1' style
+-- seed ids) maps to md5(id)::uuid in every database, so cross-service
+-- references still line up. New ids are UUIDv7 generated by the services.
+-- Each section runs in one transaction; ALTER COLUMN TYPE rewrites the table
+-- and its indexes, so schedule it in a maintenance window on large tables.
+-- query_service is new and created with UUID columns by init-databases.sql.
+
+-- Package Service
+\c package_service;
+
+BEGIN;
+
+CREATE FUNCTION pg_temp.to_uuid(value TEXT) RETURNS UUID AS $$
+    SELECT CASE
+        WHEN value ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$' THEN value::uuid
+        ELSE md5(value)::uuid
+    END
+$$ LANGUAGE SQL IMMUTABLE;
+
+-- tracking_number is UNIQUE, which already provides this index
+DROP INDEX IF EXISTS idx_packages_tracking;
+
+ALTER TABLE packages
+    ALTER COLUMN id TYPE UUID USING pg_temp.to_uuid(id),
+    ALTER COLUMN sender_id TYPE UUID USING pg_temp.to_uuid(sender_id),
+    ALTER COLUMN recipient_id TYPE UUID USING pg_temp.to_uuid(recipient_id);
+
+COMMIT;
+
+ANALYZE packages;
+
+-- Delivery Service
+\c delivery_service;
+
+BEGIN;
+
+CREATE FUNCTION pg_temp.to_uuid(value TEXT) RETURNS UUID AS $$
+    SELECT CASE
+        WHEN value ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$' THEN value::uuid
+        ELSE md5(value)::uuid
+    END
+$$ LANGUAGE SQL IMMUTABLE;
+
+ALTER TABLE deliveries
+    ALTER COLUMN id TYPE UUID USING pg_temp.to_uuid(id),
+    ALTER COLUMN package_id TYPE UUID USING pg_temp.to_uuid(package_id),
+    ALTER COLUMN driver_id TYPE UUID USING pg_temp.to_uuid(driver_id);
+
+ALTER TABLE delivery_routes
+    ALTER COLUMN id TYPE UUID USING pg_temp.to_uuid(id),
+    ALTER COLUMN driver_id TYPE UUID USING pg_temp.to_uuid(driver_id);
+
+-- Route delivery lists hold delivery ids as JSON strings
+UPDATE delivery_routes SET deliveries = (
+    SELECT coalesce(jsonb_agg(pg_temp.to_uuid(delivery.id)::text ORDER BY delivery.position), '[]'::jsonb)
+    FROM jsonb_array_elements_text(deliveries) WITH ORDINALITY AS delivery(id, position)
+);
+
+COMMIT;
+
+ANALYZE deliveries;
+ANALYZE delivery_routes;
+
+-- User Service
+\c user_service;
+
+BEGIN;
+
+CREATE FUNCTION pg_temp.to_uuid(value TEXT) RETURNS UUID AS $$
+    SELECT CASE
+        WHEN value ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$' THEN value::uuid
+        ELSE md5(value)::uuid
+    END
+$$ LANGUAGE SQL IMMUTABLE;
+
+-- email is UNIQUE, which already provides this index
+DROP INDEX IF EXISTS idx_users_email;
+
+-- The foreign key must be dropped while both sides change type
+ALTER TABLE addresses DROP CONSTRAINT IF EXISTS addresses_user_id_fkey;
+
+ALTER TABLE users
+    ALTER COLUMN id TYPE UUID USING pg_temp.to_uuid(id);
+
+ALTER TABLE addresses
+    ALTER COLUMN id TYPE UUID USING pg_temp.to_uuid(id),
+    ALTER COLUMN user_id TYPE UUID USING pg_temp.to_uuid(user_id);
+
+ALTER TABLE addresses ADD CONSTRAINT addresses_user_id_fkey FOREIGN KEY (user_id) REFERENCES users(id);
+
+COMMIT;
+
+ANALYZE users;
+ANALYZE addresses;
@@ -3,42 +3,42 @@
 
 -- Insert sample customers
 INSERT INTO users (id, email, password_hash, first_name, last_name, phone, user_type) VALUES
-('customer-1', 'john.doe@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'John', 'Doe', '+1234567890', 'customer'),
-('customer-2', 'jane.smith@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Jane', 'Smith', '+1234567891', 'customer'),
-('customer-3', 'bob.wilson@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Bob', 'Wilson', '+1234567892', 'customer');
+('9b11f2b6-c864-10c9-2923-3afa11655811', 'john.doe@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'John', 'Doe', '+1234567890', 'customer'),
+('9fc215fc-9f6f-3076-87bd-57ce71263b4c', 'jane.smith@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Jane', 'Smith', '+1234567891', 'customer'),
+('d1b3acd3-6066-0a17-8057-9a5e8d462712', 'bob.wilson@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Bob', 'Wilson', '+1234567892', 'customer');
 
 -- Insert sample drivers
 INSERT INTO users (id, email, password_hash, first_name, last_name, phone, user_type) VALUES
-('driver-1', 'mike.driver@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Mike', 'Driver', '+1234567893', 'driver'),
-('driver-2', 'sarah.delivery@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Sarah', 'Delivery', '+1234567894', 'driver');
+('a6efc71c-384f-3cb0-0f2c-6d0d82e754fe', 'mike.driver@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Mike', 'Driver', '+1234567893', 'driver'),
+('144f496a-9827-f3ce-b2d3-744ceac9ca8f', 'sarah.delivery@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Sarah', 'Delivery', '+1234567894', 'driver');
 
 -- Insert sample admin
 INSERT INTO users (id, email, password_hash, first_name, last_name, phone, user_type) VALUES
-('admin-1', 'admin@parceldelivery.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Admin', 'User', '+1234567895', 'admin');
+('f6a3266e-ad53-c628-db1b-126064854c85', 'admin@parceldelivery.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj/VcSAg/9qm', 'Admin', 'User', '+1234567895', 'admin');
 
 -- Insert sample addresses
 INSERT INTO addresses (id, user_id, address_type, street_address, city, state, postal_code, is_default) VALUES
-('addr-1', 'customer-1', 'home', '123 Main St', 'New York', 'NY', '10001', true),
-('addr-2', 'customer-2', 'home', '456 Oak Ave', 'Los Angeles', 'CA', '90210', true),
-('addr-3', 'customer-3', 'home', '789 Pine Rd', 'Chicago', 'IL', '60601', true),
-('addr-4', 'customer-1', 'work', '321 Business Blvd', 'New York', 'NY', '10002', false);
+('5b773457-668e-05f2-c188-1b4e0af98668', '9b11f2b6-c864-10c9-2923-3afa11655811', 'home', '123 Main St', 'New York', 'NY', '10001', true),
+('f8b76989-4d39-fcc3-2b8a-6b0c57bdf6d7', '9fc215fc-9f6f-3076-87bd-57ce71263b4c', 'home', '456 Oak Ave', 'Los Angeles', 'CA', '90210', true),
+('9dea1603-f004-d6ad-cd3d-ca2d8f7774a9', 'd1b3acd3-6066-0a17-8057-9a5e8d462712', 'home', '789 Pine Rd', 'Chicago', 'IL', '60601', true),
+('28a7a522-4330-a8f6-41e3-7e5116c15a96', '9b11f2b6-c864-10c9-2923-3afa11655811', 'work', '321 Business Blvd', 'New York', 'NY', '10002', false);
 
 -- Seed Package Service with sample data
 \c package_service;
 
 INSERT INTO packages (id, tracking_number, sender_id, recipient_id, sender_address, recipient_address, weight, dimensions, status) VALUES
-('pkg-1', 'PKG202412091234ABCD', 'customer-1', 'customer-2', '123 Main St, New York, NY 10001', '456 Oak Ave, Los Angeles, CA 90210', 2.5, '12x8x6', 'created'),
-('pkg-2', 'PKG202412091235EFGH', 'customer-2', 'customer-3', '456 Oak Ave, Los Angeles, CA 90210', '789 Pine Rd, Chicago, IL 60601', 1.2, '8x6x4', 'in_transit'),
-('pkg-3', 'PKG202412091236IJKL', 'customer-3', 'customer-1', '789 Pine Rd, Chicago, IL 60601', '123 Main St, New York, NY 10001', 3.8, '15x10x8', 'delivered');
+('ed9c3ac3-f7c7-0161-ae38-0944e672b647', 'PKG202412091234ABCD', '9b11f2b6-c864-10c9-2923-3afa11655811', '9fc215fc-9f6f-3076-87bd-57ce71263b4c', '123 Main St, New York, NY 10001', '456 Oak Ave, Los Angeles, CA 90210', 2.5, '12x8x6', 'created'),
+('5f4d7751-fffe-ea87-6c20-0a48d01d1049', 'PKG202412091235EFGH', '9fc215fc-9f6f-3076-87bd-57ce71263b4c', 'd1b3acd3-6066-0a17-8057-9a5e8d462712', '456 Oak Ave, Los Angeles, CA 90210', '789 Pine Rd, Chicago, IL 60601', 1.2, '8x6x4', 'in_transit'),
+('f9df468c-d7a7-e50a-6fd2-818fdeac1480', 'PKG202412091236IJKL', 'd1b3acd3-6066-0a17-8057-9a5e8d462712', '9b11f2b6-c864-10c9-2923-3afa11655811', '789 Pine Rd, Chicago, IL 60601', '123 Main St, New York, NY 10001', 3.8, '15x10x8', 'delivered');
 
 -- Seed Delivery Service with sample data
 \c delivery_service;
 
 INSERT INTO deliveries (id, package_id, driver_id, pickup_address, delivery_address, status, estimated_delivery) VALUES
-('del-1', 'pkg-1', 'driver-1', '123 Main St, New York, NY 10001', '456 Oak Ave, Los Angeles, CA 90210', 'assigned', '2024-12-15 14:00:00'),
-('del-2', 'pkg-2', 'driver-2', '456 Oak Ave, Los Angeles, CA 90210', '789 Pine Rd, Chicago, IL 60601', 'in_transit', '2024-12-12 16:00:00'),
-('del-3', 'pkg-3', 'driver-1', '789 Pine Rd, Chicago, IL 60601', '123 Main St, New York, NY 10001', 'delivered', '2024-12-10 10:00:00');
+('0bde4967-4fb7-ab1e-71c5-98de3c85d524', 'ed9c3ac3-f7c7-0161-ae38-0944e672b647', 'a6efc71c-384f-3cb0-0f2c-6d0d82e754fe', '123 Main St, New York, NY 10001', '456 Oak Ave, Los Angeles, CA 90210', 'assigned', '2024-12-15 14:00:00'),
+('d9463981-e255-1d7d-7921-f8ad96d7fc2a', '5f4d7751-fffe-ea87-6c20-0a48d01d1049', '144f496a-9827-f3ce-b2d3-744ceac9ca8f', '456 Oak Ave, Los Angeles, CA 90210', '789 Pine Rd, Chicago, IL 60601', 'in_transit', '2024-12-12 16:00:00'),
+('44049594-24b9-4fbe-4d8a-397caa5ec6bd', 'f9df468c-d7a7-e50a-6fd2-818fdeac1480', 'a6efc71c-384f-3cb0-0f2c-6d0d82e754fe', '789 Pine Rd, Chicago, IL 60601', '123 Main St, New York, NY 10001', 'delivered', '2024-12-10 10:00:00');
 
 INSERT INTO delivery_routes (id, driver_id, route_name, deliveries, status) VALUES
-('route-1', 'driver-1', 'East Coast Route', '["del-1", "del-3"]', 'active'),
-('route-2', 'driver-2', 'Midwest Route', '["del-2"]', 'active');
+('03dc2057-1169-be15-0f64-1d5482538209', 'a6efc71c-384f-3cb0-0f2c-6d0d82e754fe', 'East Coast Route', '["0bde4967-4fb7-ab1e-71c5-98de3c85d524", "44049594-24b9-4fbe-4d8a-397caa5ec6bd"]', 'active'),
+('0e2fbbee-0369-bb7a-e500-13550637cecc', '144f496a-9827-f3ce-b2d3-744ceac9ca8f', 'Midwest Route', '["d9463981-e255-1d7d-7921-f8ad96d7fc2a"]', 'active');
@@ -0,0 +1,66 @@
+"""Code shared by every Flask app, the api-gateway included.
+
+Needs only Flask (and orjson when installed), so the gateway image does not
+pull in the database and broker packages that service_common.py imports.
+Images are built from the repository root and copy shared/ next to app.py;
+to run a service from a checkout, put shared/ on the path:
+
+    cd package-service && PYTHONPATH=../shared python app.py
+"""
+from flask.json.provider import DefaultJSONProvider
+import re
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, falling back to the stdlib encoder"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+    
+    def dumpb(self, obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+    
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            kwargs.setdefault('default', self.default)
+            return super().dumps(obj, **kwargs)
+        return self.dumpb(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumpb(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+# Tracing (W3C traceparent: version-trace_id-span_id-flags)
+def parse_trace_id(traceparent):
+    parts = (traceparent or '').split('-')
+    if len(parts) == 4 and len(parts[1]) == 32:
+        return parts[1]
+    return None
+
+# Identifiers
+UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+def is_uuid(value):
+    """Whether value is a canonical UUID string, checked before it reaches a UUID column"""
+    return bool(UUID_PATTERN.match(value or ''))
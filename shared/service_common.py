@@ -0,0 +1,294 @@
+"""Code shared by the package, delivery, user and query services.
+
+Builds on http_common.py, which the api-gateway uses on its own since it has
+no database or broker. See there for how images and checkouts find shared/.
+"""
+from flask import request, g, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool, QueuePool
+from prometheus_client import CollectorRegistry, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+import sqlalchemy
+import os
+import re
+import json
+import pika
+import msgpack
+import time
+from datetime import datetime, timedelta
+import uuid
+import threading
+
+from http_common import parse_trace_id, is_uuid
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Database engine profile
+DB_POOL_MODE = os.getenv('DB_POOL_MODE', 'session')  # session, or transaction behind a PgBouncer-style pooler
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '5000'))
+
+POOL_STATS = {'checkouts': 0, 'timeouts': 0, 'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0}
+pool_stats_lock = threading.Lock()
+
+class PoolTimingMixin:
+    """Records checkout counts and time spent waiting for a connection"""
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with pool_stats_lock:
+                POOL_STATS['checkouts'] += 1
+                POOL_STATS['timeouts'] += timed_out
+                POOL_STATS['wait_seconds_total'] += waited
+                POOL_STATS['wait_seconds_max'] = max(POOL_STATS['wait_seconds_max'], waited)
+
+class TimedQueuePool(PoolTimingMixin, QueuePool):
+    pass
+
+class TimedNullPool(PoolTimingMixin, NullPool):
+    pass
+
+def engine_options(database_url):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from the DB_* environment variables"""
+    options = {'query_cache_size': int(os.getenv('DB_QUERY_CACHE_SIZE', '500'))}
+    if not database_url.startswith('postgresql'):
+        return options
+    
+    connect_args = {'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '5'))}
+    if DB_POOL_MODE == 'transaction':
+        # The pooler hands out server connections per transaction: keep none
+        # locally. Startup options are not forwarded, so instrument_engine()
+        # sets statement_timeout at the start of each transaction instead.
+        options.update({'poolclass': TimedNullPool, 'connect_args': connect_args})
+        return options
+    
+    connect_args['options'] = f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'
+    
+    options.update({
+        'poolclass': TimedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'connect_args': connect_args
+    })
+    return options
+
+def is_disconnect(error):
+    """Whether a database error means the database is unreachable rather than the event is bad"""
+    return (isinstance(error, (sqlalchemy.exc.OperationalError, sqlalchemy.exc.InterfaceError)) or
+            getattr(error, 'connection_invalidated', False))
+
+def pool_stats_snapshot(engine):
+    """POOL_STATS plus the live state of the engine's pool, for /pool-stats"""
+    with pool_stats_lock:
+        stats = dict(POOL_STATS)
+    pool = engine.pool
+    stats['pool_class'] = type(pool).__name__
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow()
+        })
+    return stats
+
+# Metrics
+METRICS_REGISTRY = CollectorRegistry()
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency', ['method', 'route', 'status'], registry=METRICS_REGISTRY)
+DB_QUERY_LATENCY = Histogram('db_query_duration_seconds', 'Database statement execution time', registry=METRICS_REGISTRY)
+PUBLISH_LATENCY = Histogram('event_publish_duration_seconds', 'Time to publish an event to parcel_events', ['routing_key'], registry=METRICS_REGISTRY)
+CONSUMER_LAG = Histogram('event_consumer_lag_seconds', 'Delay between publishing and processing an event', ['queue'],
+                         buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60), registry=METRICS_REGISTRY)
+CONSUMER_BATCH_SIZE = Histogram('event_consumer_batch_size', 'Events processed per consumer batch', ['queue'],
+                                buckets=(1, 10, 50, 100, 250, 500, 1000, 2500), registry=METRICS_REGISTRY)
+
+class PoolStatsCollector:
+    """Exposes POOL_STATS and the live pool state of db's engine at scrape time"""
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def collect(self):
+        with pool_stats_lock:
+            stats = dict(POOL_STATS)
+        yield CounterMetricFamily('db_pool_checkouts', 'Connection checkouts', value=stats['checkouts'])
+        yield CounterMetricFamily('db_pool_timeouts', 'Checkouts that timed out', value=stats['timeouts'])
+        yield CounterMetricFamily('db_pool_wait_seconds', 'Time spent waiting for a connection', value=stats['wait_seconds_total'])
+        yield GaugeMetricFamily('db_pool_wait_seconds_max', 'Longest wait for a connection', value=stats['wait_seconds_max'])
+        if has_app_context() and isinstance(self.db.engine.pool, QueuePool):
+            pool = self.db.engine.pool
+            yield GaugeMetricFamily('db_pool_size', 'Configured pool size', value=pool.size())
+            yield GaugeMetricFamily('db_pool_checked_out', 'Connections in use', value=pool.checkedout())
+            yield GaugeMetricFamily('db_pool_overflow', 'Connections above pool size', value=pool.overflow())
+
+# The start time lives on the execution context, which is discarded with the
+# statement, so a statement that raises (and never reaches the after event)
+# leaves nothing behind on the connection
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+def record_query_latency(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        DB_QUERY_LATENCY.observe(time.perf_counter() - context._query_started)
+
+def apply_statement_timeout(conn):
+    # SET LOCAL lasts until the end of the transaction, i.e. as long as the pooler's server connection
+    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+
+def instrument_engine(engine):
+    """Attach the statement timing listeners (and, in transaction pool mode, the statement timeout) to an engine"""
+    event.listen(engine, 'before_cursor_execute', start_query_timer)
+    event.listen(engine, 'after_cursor_execute', record_query_latency)
+    if DB_POOL_MODE == 'transaction' and engine.dialect.name == 'postgresql':
+        event.listen(engine, 'begin', apply_statement_timeout)
+
+# Tracing (W3C traceparent: version-trace_id-span_id-flags)
+def child_traceparent(traceparent=None):
+    """traceparent for an outgoing call or message, continuing the given or current trace"""
+    trace_id = parse_trace_id(traceparent)
+    if trace_id is None and has_request_context():
+        trace_id = g.get('trace_id')
+    return f"00-{trace_id or uuid.uuid4().hex}-{os.urandom(8).hex()}-01"
+
+def observe_consumer_lag(queue, message):
+    if message.get('timestamp'):
+        lag = (datetime.utcnow() - datetime.fromisoformat(message['timestamp'])).total_seconds()
+        CONSUMER_LAG.labels(queue).observe(max(lag, 0))
+
+def start_request():
+    g.request_started = time.perf_counter()
+    g.trace_id = parse_trace_id(request.headers.get('traceparent')) or uuid.uuid4().hex
+
+def finish_request(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUEST_LATENCY.labels(request.method, route, response.status_code).observe(time.perf_counter() - g.request_started)
+    response.headers['traceparent'] = child_traceparent()
+    return response
+
+def init_request_hooks(app):
+    """Time every request and continue (or start) its trace"""
+    app.before_request(start_request)
+    app.after_request(finish_request)
+
+# Keyset paging for bulk list reads such as the query-service backfill: ?limit=N&after=<last id>
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '10000'))
+
+def keyset_page(query, id_column):
+    """Apply the request's after/limit arguments to a list query; None when after is not a UUID"""
+    after = request.args.get('after')
+    limit = request.args.get('limit', type=int)
+    if after is None and limit is None:
+        return query
+    if after is not None:
+        if not is_uuid(after):
+            return None
+        query = query.where(id_column > after)
+    query = query.order_by(id_column)
+    if limit is not None:
+        query = query.limit(max(1, min(limit, MAX_PAGE_SIZE)))
+    return query
+
+# Identifiers: time-ordered UUIDs keep primary-key inserts at the right edge of the btree
+def uuid7():
+    """UUID version 7: 48-bit Unix millisecond timestamp followed by random bits"""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | 0x7 << 76  # version
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
+# Event encoding configuration. Consumers older than decode_event() only read
+# uncompressed JSON, so upgrade every consumer before a publisher turns on
+# msgpack or compression.
+EVENT_ENCODING = os.getenv('EVENT_ENCODING', 'json')  # json or msgpack
+EVENT_COMPRESSION_THRESHOLD = int(os.getenv('EVENT_COMPRESSION_THRESHOLD', '0'))  # bytes; 0 disables zstd
+EVENT_SCHEMA_VERSION = 1
+
+# Payload fields carried as 16-byte UUIDs / msgpack timestamps in the binary encoding
+UUID_FIELDS = {'id', 'package_id', 'delivery_id', 'sender_id', 'recipient_id', 'driver_id', 'user_id'}
+TIMESTAMP_FIELDS = {'timestamp', 'created_at', 'updated_at', 'estimated_delivery', 'actual_delivery'}
+PACKED_FIELDS = UUID_FIELDS | TIMESTAMP_FIELDS
+UUID_EXT_TYPE = 1
+EPOCH = datetime(1970, 1, 1)
+
+# Only strings that unpack back to the same text are packed: lowercase canonical
+# UUIDs, and naive datetime.isoformat() output (which omits zero microseconds)
+PACKABLE_UUID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\Z')
+PACKABLE_TIMESTAMP = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.(?!000000)\d{6})?\Z')
+
+def pack_event_value(key, value):
+    """Compact a string payload value according to the event schema"""
+    if key in UUID_FIELDS:
+        if isinstance(value, str) and PACKABLE_UUID.match(value):
+            return msgpack.ExtType(UUID_EXT_TYPE, bytes.fromhex(value.replace('-', '')))
+    elif key in TIMESTAMP_FIELDS:
+        if isinstance(value, str) and PACKABLE_TIMESTAMP.match(value):
+            try:
+                delta = datetime.fromisoformat(value) - EPOCH
+            except ValueError:
+                return value
+            return msgpack.Timestamp(delta.days * 86400 + delta.seconds, delta.microseconds * 1000)
+    return value
+
+def unpack_event_value(value):
+    if isinstance(value, msgpack.Timestamp):
+        return (EPOCH + timedelta(seconds=value.seconds, microseconds=value.nanoseconds // 1000)).isoformat()
+    return value
+
+def unpack_ext(code, payload):
+    if code == UUID_EXT_TYPE:
+        digits = payload.hex()
+        return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+    return msgpack.ExtType(code, payload)
+
+def encode_event(message, headers=None):
+    """Encode an event message, returning the body and its AMQP properties"""
+    if EVENT_ENCODING == 'msgpack':
+        body = msgpack.packb([
+            EVENT_SCHEMA_VERSION,
+            message['event_type'],
+            pack_event_value('timestamp', message['timestamp']),
+            {key: pack_event_value(key, value) if key in PACKED_FIELDS else value
+             for key, value in message['data'].items()}
+        ])
+        content_type = 'application/x-msgpack'
+    else:
+        body = json.dumps(message).encode('utf-8')
+        content_type = 'application/json'
+    
+    content_encoding = None
+    if zstandard is not None and EVENT_COMPRESSION_THRESHOLD and len(body) >= EVENT_COMPRESSION_THRESHOLD:
+        body = zstandard.compress(body)
+        content_encoding = 'zstd'
+    
+    return body, pika.BasicProperties(content_type=content_type, content_encoding=content_encoding, headers=headers)
+
+def decode_event(body, properties=None):
+    """Decode a parcel_events message in either the JSON or msgpack encoding"""
+    if getattr(properties, 'content_encoding', None) == 'zstd':
+        body = zstandard.decompress(body)
+    
+    if getattr(properties, 'content_type', None) != 'application/x-msgpack':
+        return json.loads(body)
+    
+    version, event_type, timestamp, data = msgpack.unpackb(body, ext_hook=unpack_ext)
+    if version != EVENT_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported event schema version: {version}")
+    return {
+        'event_type': event_type,
+        'timestamp': unpack_event_value(timestamp),
+        'data': {key: unpack_event_value(value) if key in TIMESTAMP_FIELDS else value for key, value in data.items()}
+    }
@@ -0,0 +1,40 @@
+"""Tracking numbers, generated by package-service and validated there and in the api-gateway.
+
+Standard library only, so the gateway image copies it alongside http_common.py.
+"""
+import os
+import re
+import time
+
+# PK + millisecond timestamp and random bits in Crockford base32 + mod-37 check symbol
+CROCKFORD_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+CROCKFORD_VALUES = {symbol: value for value, symbol in enumerate(CROCKFORD_ALPHABET)}
+CROCKFORD_VALUES.update({'O': 0, 'I': 1, 'L': 1})
+CHECK_SYMBOLS = CROCKFORD_ALPHABET + '*~$=U'
+TRACKING_PREFIX = 'PK'
+TRACKING_SYMBOLS = 16  # 50-bit timestamp + 30 random bits
+# PKG + date + 8 symbols: generated numbers used hex, the sample packages in seed-data.sql other letters
+LEGACY_TRACKING_NUMBER = re.compile(r'^PKG\d{8}[0-9A-Z]{8}$')
+
+def generate_tracking_number():
+    value = (time.time_ns() // 1_000_000) << 30 | int.from_bytes(os.urandom(4), 'big') >> 2
+    symbols = ''.join(CROCKFORD_ALPHABET[value >> shift & 31] for shift in range(5 * (TRACKING_SYMBOLS - 1), -1, -5))
+    return f"{TRACKING_PREFIX}{symbols}{CHECK_SYMBOLS[value % 37]}"
+
+def normalize_tracking_number(tracking_number):
+    """Canonical form of a tracking number, or None when it is malformed or fails its check symbol"""
+    tracking_number = tracking_number.strip().upper()
+    if LEGACY_TRACKING_NUMBER.match(tracking_number):
+        return tracking_number
+    if len(tracking_number) != len(TRACKING_PREFIX) + TRACKING_SYMBOLS + 1 or not tracking_number.startswith(TRACKING_PREFIX):
+        return None
+    value = 0
+    for symbol in tracking_number[len(TRACKING_PREFIX):-1]:
+        if symbol not in CROCKFORD_VALUES:
+            return None
+        value = value << 5 | CROCKFORD_VALUES[symbol]
+    if tracking_number[-1] != CHECK_SYMBOLS[value % 37]:
+        return None
+    return tracking_number[:len(TRACKING_PREFIX)] + ''.join(
+        CROCKFORD_ALPHABET[value >> shift & 31] for shift in range(5 * (TRACKING_SYMBOLS - 1), -1, -5)
+    ) + tracking_number[-1]